@@ -1,14 +1,31 @@
 #!/usr/bin/env python3
 
 import argparse
+import os
 import random
 import string
 import time
 from ragfile_utils import RAGFileWriter, RAGFileReader
 
 
-def random_string(length):
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+ALPHABET = (string.ascii_letters + string.digits).encode()
+
+# byte -> alphabet character; bytes >= 248 are dropped so that b % 62 stays uniform
+ALPHABET_TABLE = bytes(ALPHABET[b % len(ALPHABET)] for b in range(256))
+ALPHABET_REJECT = bytes(range(256 - 256 % len(ALPHABET), 256))
+
+
+def random_strings(n, length):
+    """
+    Generate n random alphanumeric byte strings of the given length.
+    One os.urandom draw is mapped onto the alphabet with a single bytes.translate
+    (rejected bytes are topped up), then sliced into strings.
+    """
+    need = n * length
+    raw = b""
+    while len(raw) < need:
+        raw += os.urandom(need - len(raw) + need // 16 + 8).translate(ALPHABET_TABLE, ALPHABET_REJECT)
+    return [raw[i * length:(i + 1) * length] for i in range(n)]
 
 
 def main():
@@ -18,27 +35,26 @@ def main():
     parser.add_argument("--content_length", type=int, default=64)
     parser.add_argument("--padding", type=int, default=8, choices=[4, 8, 16])
     parser.add_argument("--output", type=str, default="benchmark.ragfile")
+    parser.add_argument("--jit", action="store_true", help="scan with the numba-compiled walker (overrides the mmap.find and fixed-length scans)")
     args = parser.parse_args()
 
     # -------------------------
-    # Generate keyword-content pairs
+    # Generate keyword-content pairs (bytes throughout: no encode/decode on either side)
     # -------------------------
     print(f"Generating {args.num_keywords} keyword-content pairs...")
-    keyword_content_pairs = []
-    for _ in range(args.num_keywords):
-        kw = random_string(args.str_length)
-        content = random_string(args.content_length)
-        keyword_content_pairs.append({"keyword": kw, "content": content})
+    keywords = random_strings(args.num_keywords, args.str_length)
+    contents = random_strings(args.num_keywords, args.content_length)
+    keyword_content_pairs = list(zip(keywords, contents))
 
     # pick a random keyword to search
-    search_kw = random.choice(keyword_content_pairs)["keyword"]
-    print(f"Searching for keyword: {search_kw}")
+    search_kw = random.choice(keywords)
+    print(f"Searching for keyword: {search_kw.decode('ascii')}")
 
     # -------------------------
     # Python in-memory search
     # -------------------------
     start_py = time.time()
-    py_found = [p for p in keyword_content_pairs if p["keyword"] == search_kw]
+    py_found = [{"keyword": kw, "content": content} for kw, content in keyword_content_pairs if kw == search_kw]
     end_py = time.time()
     print(f"Python search found {len(py_found)} entries in {end_py - start_py:.6f} seconds")
 
@@ -57,7 +73,7 @@ def main():
     # -------------------------
     reader = RAGFileReader(args.output)
     start_rag = time.time()
-    rag_found = reader.search_keyword(search_kw, padding=args.padding)
+    rag_found = reader.search_keyword(search_kw, padding=args.padding, jit=args.jit, decode=False)
     end_rag = time.time()
     print(f"RAGFile search found {len(rag_found)} entries in {end_rag - start_rag:.6f} seconds")
 
@@ -67,6 +83,17 @@ def main():
     speedup = (end_py - start_py) / (end_rag - start_rag) if (end_rag - start_rag) > 0 else float("inf")
     print(f"Speedup: Python / RAGFile = {speedup:.2f}x")
 
+    # -------------------------
+    # Round-trip check: every written keyword must come back with its contents
+    # -------------------------
+    expected = {}
+    for kw, content in keyword_content_pairs:
+        expected.setdefault(kw, []).append(content)
+    for kw, kw_contents in expected.items():
+        found = [r["content"] for r in reader.search_keyword_indexed(kw, padding=args.padding, decode=False)]
+        assert sorted(found) == sorted(kw_contents), f"Round-trip mismatch for keyword {kw!r}"
+    print(f"Round-trip check passed for {len(expected)} keywords")
+
 
 if __name__ == "__main__":
     main()
@@ -49,7 +49,8 @@ def generate_embedding(text: str, precision: int) -> np.ndarray:
 
     if precision == 16:
         return np.asarray(vector, dtype=np.float16)
-    elif precision == 32:
+    elif precision in (32, 116, 108):
+        # bf16 / fp8 are produced from float32 by the writer
         return np.asarray(vector, dtype=np.float32)
     else:
         raise ValueError("Unsupported precision")
@@ -75,9 +76,9 @@ def main():
     parser.add_argument(
         "--precision",
         type=int,
-        choices=[16, 32],
+        choices=[16, 32, 116, 108],
         default=32,
-        help="Embedding float precision",
+        help="Embedding precision (16 = fp16, 32 = fp32, 116 = bf16, 108 = fp8 e5m2)",
     )
 
     args = parser.parse_args()
@@ -109,7 +110,7 @@ def main():
     writer = RAGFileWriter(args.output)
 
     # Write header (magic + version + endian)
-    writer.write_header(major=0, minor=1, patch=0)
+    writer.write_header(major=0, minor=2, patch=0)
 
     # Write sections (RAGFile schema handles offsets internally)
     writer.write_keyword_section(
@@ -1,150 +1,496 @@
+import os
 import struct
 import sys
-from typing import List, Dict
+from itertools import accumulate
+from typing import List, Dict, Tuple, Union
 import numpy as np
 import binascii 
+import hashlib
 import mmap 
 
+def _as_bytes(value: Union[str, bytes]) -> bytes:
+    """UTF-8 encodes str; bytes are passed through without a round-trip."""
+    return value if isinstance(value, bytes) else value.encode("utf-8")
+
+
+def _keyword_digest(keyword: bytes) -> Tuple[int, int]:
+    """
+    The two little-endian 64-bit halves (h1, h2) of the keyword's 128-bit BLAKE2b digest
+    (stable across processes, unlike hash()). h1 picks the hash index slot and both
+    halves drive the Bloom filter, so each keyword is hashed once.
+    """
+    digest = hashlib.blake2b(keyword, digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+def _keyword_digests(keywords: List[bytes]) -> np.ndarray:
+    """_keyword_digest for many keywords at once, as an (n, 2) uint64 array of (h1, h2)."""
+    raw = b"".join([hashlib.blake2b(kw, digest_size=16).digest() for kw in keywords])
+    return np.frombuffer(raw, dtype="<u8").reshape(-1, 2)
+
+
+def _bloom_bits(digest: Tuple[int, int], nbits: int, nhashes: int) -> List[int]:
+    """
+    Bit positions of a keyword in a Bloom filter of `nbits` (a power of two) bits.
+    Double hashing over the two halves of the keyword's digest.
+    """
+    h1, h2 = digest
+    return [(h1 + i * h2) & (nbits - 1) for i in range(nhashes)]
+
+
+def _bloom_bits_batch(digests: np.ndarray, nbits: int, nhashes: int) -> np.ndarray:
+    """
+    _bloom_bits for many keywords at once, in one NumPy expression. uint64 arithmetic
+    wraps like the masked Python ints in _bloom_bits, since nbits is a power of two.
+    """
+    h1, h2 = digests[:, :1], digests[:, 1:]
+    return (h1 + np.arange(nhashes, dtype=np.uint64) * h2) & np.uint64(nbits - 1)
+
+
+def _scan_records(buf: np.ndarray, start: int, end: int, padding: int, needle: np.ndarray) -> np.ndarray:
+    """
+    Walks the padded records of buf[start:end] and returns the offsets of the
+    records that begin with `needle`.
+    A record ends in the first padding unit whose last byte is \x00, so the walk
+    only touches one byte per padding unit past the needle compare.
+    Compiled with numba on first use through _jit_scan_records.
+    """
+    out = np.empty(16, dtype=np.int64)
+    n = 0
+    k = needle.shape[0]
+    pos = start
+    while pos < end:
+        match = pos + k <= end
+        i = 0
+        while match and i < k:
+            if buf[pos + i] != needle[i]:
+                match = False
+            i += 1
+        if match:
+            if n == out.shape[0]:
+                grown = np.empty(2 * n, dtype=np.int64)
+                grown[:n] = out
+                out = grown
+            out[n] = pos
+            n += 1
+
+        pos += padding
+        while pos < end and buf[pos - 1] != 0:
+            pos += padding
+    return out[:n]
+
+
+# numba-compiled _scan_records, built on first use; False once numba is known to be missing
+_scan_records_jit = None
+
+
+def _jit_scan_records():
+    """
+    Returns the numba-compiled _scan_records, or None when numba is not installed.
+    numba is imported here rather than at module import, which it would slow down
+    by ~150ms for every reader, jit or not.
+    """
+    global _scan_records_jit
+    if _scan_records_jit is None:
+        try:
+            from numba import njit
+        except ImportError:  # numba is optional; search_keyword(jit=True) falls back to mmap.find
+            _scan_records_jit = False
+        else:
+            _scan_records_jit = njit(cache=True)(_scan_records)
+    return _scan_records_jit or None
+
+
+# Section name <-> id used by the binary index strategy table
+SECTION_IDS = {
+    "keyword": 1,
+    "vector": 2,
+    "keyword_hash": 3,
+    "kw_bloom": 4,
+}
+_SECTION_NAMES = {v: k for k, v in SECTION_IDS.items()}
+
+
+# Embedding precision codes stored in the embedding section header
+PRECISION_FP16 = 16       # IEEE half
+PRECISION_FP32 = 32       # IEEE single
+PRECISION_BF16 = 116      # bfloat16 (upper 16 bits of a float32)
+PRECISION_FP8_E5M2 = 108  # fp8 e5m2 (upper 8 bits of a float16)
+
+# bytes per embedding element for each precision code
+_PRECISION_ITEMSIZE = {
+    PRECISION_FP16: 2,
+    PRECISION_FP32: 4,
+    PRECISION_BF16: 2,
+    PRECISION_FP8_E5M2: 1,
+}
+
+
+def _encode_embeddings(mat: np.ndarray, precision: int) -> np.ndarray:
+    """
+    Converts a (n, dim) matrix to the on-disk element type for `precision`.
+    BF16 and FP8 are produced by truncating the low mantissa bits.
+    """
+    if precision == PRECISION_FP16:
+        return mat.astype(np.float16, copy=False)
+    if precision == PRECISION_FP32:
+        return mat.astype(np.float32, copy=False)
+    if precision == PRECISION_BF16:
+        return (np.ascontiguousarray(mat, dtype=np.float32).view(np.uint32) >> 16).astype(np.uint16)
+    if precision == PRECISION_FP8_E5M2:
+        return (np.ascontiguousarray(mat, dtype=np.float16).view(np.uint16) >> 8).astype(np.uint8)
+    raise ValueError(f"Unsupported precision: {precision}")
+
+
+def _decode_embeddings(raw: bytes, precision: int, dim: int) -> np.ndarray:
+    """
+    Inverse of _encode_embeddings: returns a (n, dim) float16/float32 matrix.
+    """
+    if precision == PRECISION_FP16:
+        mat = np.frombuffer(raw, dtype=np.float16)
+    elif precision == PRECISION_FP32:
+        mat = np.frombuffer(raw, dtype=np.float32)
+    elif precision == PRECISION_BF16:
+        mat = (np.frombuffer(raw, dtype=np.uint16).astype(np.uint32) << 16).view(np.float32)
+    elif precision == PRECISION_FP8_E5M2:
+        mat = (np.frombuffer(raw, dtype=np.uint8).astype(np.uint16) << 8).view(np.float16)
+    else:
+        raise ValueError(f"Unsupported precision: {precision}")
+    return mat.reshape(-1, dim)
+
+
 class RAGFileWriter:
     """
-    RAGFileWriter (schema v0.1.0)
+    RAGFileWriter (schema v0.2.0)
 
     Binary layout (in order):
 
     1) Magic header            : b"RAGFILE" (7 bytes)
     2) Version                 : uint8 major, uint8 minor, uint8 patch
     3) Endianness              : uint8 (0 = little, 1 = big)
-    4) Index strategy section   : {section}-({start,end})\x00 repeated
-       - Records absolute start/end offsets for each section
+    4) Index strategy section   : uint16 slot size L, then an L-byte slot holding
+                                  uint8 count, count x (uint8 section id, uint64 start, uint64 end)
+       - Reserved by write_header and filled in place by finalize
+       - Records absolute start/end offsets for each section (ids in SECTION_IDS)
        - Allows readers to seek directly to sections without parsing the whole file
-    5) Keyword-content section :
-         - start-byte (uint64)
-         - end-byte   (uint64)
-         - padding    (uint8)
-         - raw data (each record: {keyword}-{content}, padded)
+    5) Keyword-content section (struct-of-arrays) :
+         - start-byte     (uint64)
+         - end-byte       (uint64)
+         - padding        (uint8)
+         - keyword-length (uint8, length shared by every keyword, 0 = mixed)
+         - record count n (uint64)
+         - keywords-start (uint64, absolute offset of the keyword blob)
+         - contents-start (uint64, absolute offset of the content blob)
+         - raw data :
+             keyword offsets (n + 1 uint64, relative to keywords-start)
+             content offsets (n + 1 uint64, relative to contents-start)
+             keyword blob    (each keyword NUL-padded to `padding`)
+             content blob    (contents back to back, unpadded)
     6) Embedding-content section :
-         - precision  (uint8)
+         - precision  (uint8: 16 = fp16, 32 = fp32, 116 = bf16, 108 = fp8 e5m2)
          - start-byte (uint64)
          - end-byte   (uint64)
          - padding    (uint8)
          - raw data (each record: {embedding}-{content}, padded)
+    7) Keyword hash section (written with the keyword-content section) :
+         - start-byte (uint64)
+         - end-byte   (uint64)
+         - open-addressing table of uint64 slots (0 = empty, else record index + 1)
+    8) Keyword Bloom filter section (written with the keyword-content section) :
+         - start-byte (uint64)
+         - end-byte   (uint64)
+         - hashes     (uint8, bits set per keyword)
+         - bit array as uint64 words (size a power of two, ~10 bits per keyword)
 
     Notes:
     - Sections can be optional beyond header (1-3)
     - Padding ensures alignment for memory-mapped or chunked reads
+    - Every padded record ends with at least one \x00, so records never run together
     - Index strategy section is authoritative for locating sections
+    - Sections are kept as a list of chunks and gathered into the file with one
+      writev at finalize(); only the header is patched after it is written
     """
 
     MAGIC = b"RAGFILE"
+    VERSION = (0, 2, 0)     # schema version written by write_header
+    HEADER_END = 11         # magic + version + endian
+    MAX_INDEX_BYTES = 256   # index strategy slot reserved after the header (15 entries)
+    BLOOM_HASHES = 4        # bits set per keyword in the keyword Bloom filter
 
     def __init__(self, filepath: str):
         self.filepath = filepath
-        self.buf = bytearray()
+        self.head = bytearray()        # header + index strategy slot (patched at finalize)
+        self.chunks: List[bytes] = []  # section bytes, in file order
+        self.pos = 0                   # absolute offset of the next byte to be written
         self.index_entries: List = []
 
         # Determine endianness
         self.endian_flag = 0 if sys.byteorder == "little" else 1
         self.struct_prefix = "<" if self.endian_flag == 0 else ">"
 
- 
-    def _u8(self, v): return struct.pack(self.struct_prefix + "B", v)
+        # precompiled formats (avoids re-parsing the format string on every call)
+        self._u8_s = struct.Struct(self.struct_prefix + "B")
+        self._u64_s = struct.Struct(self.struct_prefix + "Q")
+        self._index_s = struct.Struct(self.struct_prefix + "BQQ")
+
+    def _u8(self, v): return self._u8_s.pack(v)
     
-    def _u64(self, v): return struct.pack(self.struct_prefix + "Q", v)
+    def _u64(self, v): return self._u64_s.pack(v)
+
+    @staticmethod
+    def _padded_len(length: int, alignment: int) -> int:
+        # always leave at least one \x00 so every record is NUL-terminated
+        return (length // alignment + 1) * alignment
 
     @staticmethod
-    def _pad(data: bytes, alignment: int) -> bytes:
-        pad_len = (alignment - (len(data) % alignment)) % alignment
-        return data + (b"\x00" * pad_len)
+    def _check_no_nul(values: List[bytes], what: str):
+        """
+        Raises ValueError if any value contains \x00, which terminates padded slots.
+        """
+        for value in values:
+            if b"\x00" in value:
+                raise ValueError(f"{what} must not contain \\x00 (it terminates padded records): {value!r}")
+
+    def _append(self, chunk: bytes):
+        self.chunks.append(chunk)
+        self.pos += len(chunk)
+
+    def _write_padded(self, buf: bytearray, records: List[bytes], padding: int):
+        """
+        Appends records to `buf`, each NUL-padded to `padding`.
+        The buffer is grown once and records are copied into the zero-filled space.
+        """
+        padded_lens = [self._padded_len(len(r), padding) for r in records]
+        off = len(buf)
+        buf.extend(bytes(sum(padded_lens)))
+
+        with memoryview(buf) as mv:
+            for record, padded_len in zip(records, padded_lens):
+                mv[off:off + len(record)] = record
+                off += padded_len
 
     # ------------------------------------------------------------------
     # Header
     # ------------------------------------------------------------------
-    def write_header(self, major=0, minor=1, patch=0):
-        self.buf += self.MAGIC
-        self.buf += struct.pack("BBB", major, minor, patch)
-        self.buf += struct.pack("B", self.endian_flag)
+    def write_header(self, major=VERSION[0], minor=VERSION[1], patch=VERSION[2]):
+        self.head += self.MAGIC
+        self.head += struct.pack("BBB", major, minor, patch)
+        self.head += struct.pack("B", self.endian_flag)
+        # reserve the index strategy slot; it is filled in by finalize()
+        self.head += struct.pack(self.struct_prefix + "H", self.MAX_INDEX_BYTES)
+        self.head += bytes(self.MAX_INDEX_BYTES)
+        self.pos = len(self.head)
 
     # ------------------------------------------------------------------
     # Index strategy section
     # ------------------------------------------------------------------
     def write_index_strategy(self):
         """
-        Writes the index strategy section immediately after the header.
-        Each entry: {section}-({start},{end})\x00
+        Fills in the index strategy slot reserved by write_header.
+        Layout: uint8 entry count, then per entry uint8 section id, uint64 start, uint64 end
         This allows readers to seek directly to keyword/vector sections.
         """
-        table = bytearray()
-        for name, start, end in self.index_entries:
-            entry = f"{name}-({start},{end})".encode("utf-8")
-            table += entry + b"\x00"
+        if 1 + self._index_s.size * len(self.index_entries) > self.MAX_INDEX_BYTES:
+            raise ValueError(f"Index strategy table does not fit in {self.MAX_INDEX_BYTES} bytes")
 
-        header_end = len(self.MAGIC) + 3 + 1  # magic + version + endian
-        # Extend buffer if needed
-        if len(self.buf) < header_end + len(table):
-            self.buf += b"\x00" * (header_end + len(table) - len(self.buf))
-
-        self.buf[header_end:header_end + len(table)] = table
+        pos = self.HEADER_END + 2  # skip the uint16 slot size
+        self._u8_s.pack_into(self.head, pos, len(self.index_entries))
+        pos += 1
+        for name, start, end in self.index_entries:
+            self._index_s.pack_into(self.head, pos, SECTION_IDS[name], start, end)
+            pos += self._index_s.size
 
     # ------------------------------------------------------------------
     # Keyword-content section
     # ------------------------------------------------------------------
-    def write_keyword_section(self, pairs: List[Dict[str, str]], padding: int):
-        
+    def write_keyword_section(self, pairs: List[Union[Dict[str, str], Tuple[bytes, bytes]]], padding: int):
+        """
+        Writes keywords and contents as separate arrays so searches only touch
+        the (small) keyword blob; contents are read through the offset arrays on a hit.
+        pairs are {"keyword", "content"} dicts or (keyword, content) tuples; str
+        values are UTF-8 encoded and bytes are written as-is.
+        Keywords must not contain \x00 (ValueError); contents may hold any bytes.
+        """
         assert padding in (4, 8, 16)
 
-        start = len(self.buf)
+        if pairs and isinstance(pairs[0], tuple):
+            keywords = [_as_bytes(kw) for kw, _ in pairs]
+            contents = [_as_bytes(content) for _, content in pairs]
+        else:
+            keywords = [_as_bytes(pair["keyword"]) for pair in pairs]
+            contents = [_as_bytes(pair["content"]) for pair in pairs]
+        self._check_no_nul(keywords, "Keywords")
+        n = len(pairs)
+
+        # a uniform keyword length enables the reader's vectorized path (0 = mixed)
+        kw_lens = {len(kw) for kw in keywords}
+        keyword_length = kw_lens.pop() if len(kw_lens) == 1 and len(keywords[0]) < 256 else 0
+
+        kw_offsets = [0, *accumulate(self._padded_len(len(kw), padding) for kw in keywords)]
+        ct_offsets = [0, *accumulate(len(c) for c in contents)]
+
+        buf = bytearray()
 
         # section metadata
-        self.buf += self._u64(0)  # placeholder start
-        self.buf += self._u64(0)  # placeholder end
-        self.buf += self._u8(padding)
+        buf += self._u64(0)  # placeholder start
+        buf += self._u64(0)  # placeholder end
+        buf += self._u8(padding)
+        buf += self._u8(keyword_length)
+        buf += self._u64(n)
+        buf += self._u64(0)  # placeholder keywords start
+        buf += self._u64(0)  # placeholder contents start
+
+        data_start = self.pos + len(buf)
+
+        # offset arrays and the keyword blob (padded); the content blob (packed) is its own chunk
+        buf += struct.pack(f"{self.struct_prefix}{n + 1}Q", *kw_offsets)
+        buf += struct.pack(f"{self.struct_prefix}{n + 1}Q", *ct_offsets)
+        keywords_start = self.pos + len(buf)
+        self._write_padded(buf, keywords, padding)
+        contents_start = self.pos + len(buf)
+        content_blob = b"".join(contents)
+
+        data_end = contents_start + len(content_blob)
+
+        # patch start/end bytes and blob offsets
+        self._u64_s.pack_into(buf, 0, data_start)
+        self._u64_s.pack_into(buf, 8, data_end)
+        self._u64_s.pack_into(buf, 26, keywords_start)
+        self._u64_s.pack_into(buf, 34, contents_start)
+
+        self._append(buf)
+        self._append(content_blob)
+
+        # register in index entries
+        self.index_entries.append(("keyword", data_start, data_end))
 
-        data_start = len(self.buf)
+        # hash every keyword once for both the hash index and the Bloom filter
+        digests = _keyword_digests(keywords)
+        self.write_keyword_index(keywords, digests)
+        self.write_keyword_bloom(keywords, digests)
 
-        # write each keyword-content pair, padded
-        for pair in pairs:
-            record = f"{pair['keyword']}-{pair['content']}".encode("utf-8")
-            self.buf += self._pad(record, padding)
+    # ------------------------------------------------------------------
+    # Keyword hash section
+    # ------------------------------------------------------------------
+    def write_keyword_index(self, keywords: List[bytes], digests: np.ndarray = None):
+        """
+        Writes an open-addressing hash table mapping keyword -> record index
+        (the position of the keyword in the keyword-content section).
+        Table size is the next power of two >= 2 * len(keywords), probed linearly
+        from the low 64 bits (h1) of each keyword's digest.
+        `digests` is _keyword_digests(keywords), computed here when not given.
+        """
+        if digests is None:
+            digests = _keyword_digests(keywords)
+        nslots = 1 << (max(1, 2 * len(keywords)) - 1).bit_length()
+        mask = nslots - 1
+        slots = [0] * nslots
+
+        for i, slot in enumerate((digests[:, 0] & np.uint64(mask)).tolist()):
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = i + 1
 
-        data_end = len(self.buf)
+        buf = bytearray()
+
+        # section metadata
+        buf += self._u64(0)  # placeholder start
+        buf += self._u64(0)  # placeholder end
+
+        data_start = self.pos + len(buf)
+        buf += struct.pack(f"{self.struct_prefix}{nslots}Q", *slots)
+        data_end = self.pos + len(buf)
 
         # patch start/end bytes
-        self.buf[start:start + 8] = self._u64(data_start)
-        self.buf[start + 8:start + 16] = self._u64(data_end)
+        self._u64_s.pack_into(buf, 0, data_start)
+        self._u64_s.pack_into(buf, 8, data_end)
+
+        self._append(buf)
 
         # register in index entries
-        self.index_entries.append(("keyword", data_start, data_end))
+        self.index_entries.append(("keyword_hash", data_start, data_end))
 
     # ------------------------------------------------------------------
-    # Embedding-content section
+    # Keyword Bloom filter section
     # ------------------------------------------------------------------
-    def write_embedding_section(self, pairs: List[Dict], padding: int, precision: int = 32):
-        assert padding in (4, 8, 16)
-        assert precision in (16, 32)
+    def write_keyword_bloom(self, keywords: List[bytes], digests: np.ndarray = None):
+        """
+        Writes a Bloom filter over all keywords so readers can reject most
+        missing keywords without touching the keyword-content section.
+        Size is the next power of two >= 10 bits per keyword (at least one word).
+        `digests` is _keyword_digests(keywords), computed here when not given.
+        """
+        if digests is None:
+            digests = _keyword_digests(keywords)
+        nbits = 1 << (max(64, 10 * len(keywords)) - 1).bit_length()
+        bits = _bloom_bits_batch(digests, nbits, self.BLOOM_HASHES).ravel()
+        words = np.zeros(nbits // 64, dtype=np.uint64)
+        np.bitwise_or.at(words, bits >> np.uint64(6), np.uint64(1) << (bits & np.uint64(63)))
 
-        start = len(self.buf)
+        buf = bytearray()
 
         # section metadata
-        self.buf += self._u8(precision)
-        self.buf += self._u64(0)  # placeholder start
-        self.buf += self._u64(0)  # placeholder end
-        self.buf += self._u8(padding)
+        buf += self._u64(0)  # placeholder start
+        buf += self._u64(0)  # placeholder end
+        buf += self._u8(self.BLOOM_HASHES)
+
+        data_start = self.pos + len(buf)
+        buf += words.astype(self.struct_prefix + "u8").tobytes()
+        data_end = self.pos + len(buf)
 
-        data_start = len(self.buf)
+        # patch start/end bytes
+        self._u64_s.pack_into(buf, 0, data_start)
+        self._u64_s.pack_into(buf, 8, data_end)
+
+        self._append(buf)
+
+        # register in index entries
+        self.index_entries.append(("kw_bloom", data_start, data_end))
+
+    # ------------------------------------------------------------------
+    # Embedding-content section
+    # ------------------------------------------------------------------
+    def write_embedding_section(self, pairs: List[Dict], padding: int, precision: int = 32):
+        assert padding in (4, 8, 16)
+        assert precision in _PRECISION_ITEMSIZE
 
-        # write each embedding-content pair, padded
-        for pair in pairs:
-            emb: np.ndarray = pair["embedding"]
-            content: str = pair["content"]
-            emb_bytes = emb.astype(np.float16 if precision == 16 else np.float32).tobytes()
-            record = emb_bytes + b"-" + content.encode("utf-8")
-            self.buf += self._pad(record, padding)
+        buf = bytearray()
 
-        data_end = len(self.buf)
+        # section metadata
+        buf += self._u8(precision)
+        buf += self._u64(0)  # placeholder start
+        buf += self._u64(0)  # placeholder end
+        buf += self._u8(padding)
+
+        data_start = self.pos + len(buf)
+
+        # cast all embeddings in one call, then copy each row straight out of the raw bytes
+        if pairs:
+            mat = _encode_embeddings(np.stack([pair["embedding"] for pair in pairs]), precision)
+            raw = memoryview(mat.tobytes())
+            row_bytes = len(raw) // len(pairs)
+            contents = [_as_bytes(pair["content"]) for pair in pairs]
+            self._check_no_nul(contents, "Embedding contents")
+
+            # write each {embedding}-{content} pair, padded, without building the record
+            padded_lens = [self._padded_len(row_bytes + 1 + len(c), padding) for c in contents]
+            off = len(buf)
+            buf.extend(bytes(sum(padded_lens)))
+
+            with memoryview(buf) as mv:
+                for i, (content, padded_len) in enumerate(zip(contents, padded_lens)):
+                    mv[off:off + row_bytes] = raw[i * row_bytes:(i + 1) * row_bytes]
+                    mv[off + row_bytes] = 0x2D  # b"-"
+                    mv[off + row_bytes + 1:off + row_bytes + 1 + len(content)] = content
+                    off += padded_len
+
+        data_end = self.pos + len(buf)
 
         # patch start/end bytes
-        self.buf[start + 1:start + 9] = self._u64(data_start)
-        self.buf[start + 9:start + 17] = self._u64(data_end)
+        self._u64_s.pack_into(buf, 1, data_start)
+        self._u64_s.pack_into(buf, 9, data_end)
+
+        self._append(buf)
 
         # register in index entries
         self.index_entries.append(("vector", data_start, data_end))
@@ -156,15 +502,47 @@ class RAGFileWriter:
         # write the index strategy section after all offsets are known
         self.write_index_strategy()
 
-        # write buffer to file
+        # gather header and section chunks into the file without joining them
         with open(self.filepath, "wb") as f:
-            f.write(self.buf)
+            self._writev(f, [self.head, *self.chunks])
+
+    @staticmethod
+    def _writev(f, chunks: List[bytes]):
+        """
+        Writes `chunks` in order with os.writev, IOV_MAX buffers per call,
+        resuming after short writes. Falls back to writelines where writev is missing.
+        """
+        if not hasattr(os, "writev"):
+            f.writelines(chunks)
+            return
+
+        fd = f.fileno()
+        iov_max = os.sysconf("SC_IOV_MAX") if "SC_IOV_MAX" in os.sysconf_names else 1024
+        views = [memoryview(c) for c in chunks if len(c)]
+        i = 0
+        while i < len(views):
+            batch = views[i:i + iov_max]
+            written = os.writev(fd, batch)
+            # skip fully written buffers, trim a partially written one
+            for v in batch:
+                if written < len(v):
+                    views[i] = v[written:]
+                    break
+                written -= len(v)
+                i += 1
 
     # ------------------------------------------------------------------
     # Debugging
     # ------------------------------------------------------------------
     def hexdump(self, length=256):
-        print(self.buf[:length].hex())
+        for name, start, end in self.index_entries:
+            print(f"{name}-({start},{end})")
+        prefix = bytearray()
+        for chunk in [self.head, *self.chunks]:
+            if len(prefix) >= length:
+                break
+            prefix += chunk[:length - len(prefix)]
+        print(prefix.hex())
 
 
 # -------------------------
@@ -173,38 +551,79 @@ class RAGFileWriter:
 
 class RAGFileReader:
     """
-    RAGFileReader (schema v0.1.0)
+    RAGFileReader (schema v0.2.0)
 
     Supports:
       - Padding-aware keyword-content parsing
       - Section-aware reading using the absolute offsets in the file
       - Searching keywords without loading unrelated sections
 
-    Schema (strict v0.1.0):
+    Schema (strict v0.2.x; parse_index rejects other major/minor versions):
 
     1) Magic header            : b"RAGFILE" (7 bytes)
     2) Version                 : uint8 major, uint8 minor, uint8 patch
     3) Endianness              : uint8 (0 = little, 1 = big)
-    4) Index strategy section  : offsets of other sections (not variable-length null-terminated)
+    4) Index strategy section  : uint16 slot size L, then an L-byte slot holding
+                                 uint8 count, count x (uint8 section id, uint64 start, uint64 end)
     5) Keyword-content section :
+         - start-byte     (uint64)
+         - end-byte       (uint64)
+         - padding        (uint8)
+         - keyword-length (uint8, 0 = mixed)
+         - record count n (uint64)
+         - keywords-start (uint64)
+         - contents-start (uint64)
+         - raw data (keyword offsets, content offsets, padded keyword blob, content blob)
+    6) Embedding-content section :
+         - precision  (uint8: 16 = fp16, 32 = fp32, 116 = bf16, 108 = fp8 e5m2)
          - start-byte (uint64)
          - end-byte   (uint64)
          - padding    (uint8)
-         - raw data (records: {keyword}-{content}, padded to alignment)
-    6) Embedding-content section :
-         - precision  (uint8)
+         - raw data (records: {embedding}-{content}, padded to alignment)
+    7) Keyword hash section :
          - start-byte (uint64)
          - end-byte   (uint64)
-         - padding    (uint8)
-         - raw data
+         - uint64 slots (0 = empty, else keyword record index + 1)
+    8) Keyword Bloom filter section :
+         - start-byte (uint64)
+         - end-byte   (uint64)
+         - hashes     (uint8)
+         - bit array as uint64 words
     """
 
     MAGIC = b"RAGFILE"
+    VERSION = (0, 2)  # supported schema (major, minor)
 
     def __init__(self, filepath: str):
         self.filepath = filepath
         self._index = {}
         self._header_end = 11  # 7 (magic) + 3 (version) + 1 (endianness)
+        self._struct_prefix = "<"
+
+    @staticmethod
+    def _next_record(section_start: int, term: int, padding: int) -> int:
+        """
+        Offset of the record following the one whose NUL terminator is at `term`.
+        Records are padded to `padding` relative to the section start and always
+        end with at least one \x00, so the next record starts at the next boundary.
+        """
+        return section_start + ((term - section_start) // padding + 1) * padding
+
+    @staticmethod
+    def _advise(mm: mmap.mmap, advice: str, start: int, end: int):
+        """
+        Best-effort madvise hint for [start, end) of the mapping.
+        The range is widened to a page boundary; a no-op where madvise or the
+        advice constant is unavailable.
+        """
+        flag = getattr(mmap, advice, None)
+        if flag is None or end <= start:
+            return
+        page_start = start - start % mmap.PAGESIZE
+        try:
+            mm.madvise(flag, page_start, end - page_start)
+        except (AttributeError, OSError, ValueError):
+            pass
 
     # -------------------------
     # Parse index section immediately after header
@@ -212,39 +631,50 @@ class RAGFileReader:
     def parse_index(self):
         """
         Reads the index strategy section into self._index
-        Format: {strategy}-({start},{end})\x00 repeated
+        Format: uint16 slot size, then the slot: uint8 count,
+                count x (uint8 section id, uint64 start, uint64 end)
+        Raises ValueError if the file is not a RAGFile or its schema version is unsupported.
         """
         self._index = {}
         with open(self.filepath, "rb") as f:
-            f.seek(self._header_end)
-            buf = bytearray()
-            while True:
-                b = f.read(1)
-                if not b or b == b'\x00':
-                    break
-                buf += b
-            # Split entries by null byte
-            entries = buf.split(b'\x00')
-            for entry in entries:
-                if not entry:
-                    continue
-                # v0.1.0 format: strategy-(start,end)
-                try:
-                    s = entry.decode("utf-8")
-                    name, rest = s.split("-(")
-                    start_str, end_str = rest[:-1].split(",")
-                    self._index[name] = (int(start_str), int(end_str))
-                except Exception:
-                    continue
+            header = f.read(self._header_end + 2)
+            if len(header) < self._header_end + 2 or header[:len(self.MAGIC)] != self.MAGIC:
+                raise ValueError(f"{self.filepath} is not a RAGFile (bad magic header)")
+
+            major, minor, patch, endian = header[len(self.MAGIC):self._header_end]
+            if (major, minor) != self.VERSION:
+                raise ValueError(
+                    f"{self.filepath} uses RAGFile schema v{major}.{minor}.{patch}; "
+                    f"this reader supports v{self.VERSION[0]}.{self.VERSION[1]}.x"
+                )
+
+            self._struct_prefix = ">" if endian == 1 else "<"
+            (slot_size,) = struct.unpack_from(self._struct_prefix + "H", header, self._header_end)
+            slot = f.read(slot_size)
+
+        count = slot[0] if slot else 0
+        table = slot[1:1 + 17 * count]
+        for section_id, start, end in struct.iter_unpack(self._struct_prefix + "BQQ", table):
+            name = _SECTION_NAMES.get(section_id)
+            if name is not None:
+                self._index[name] = (start, end)
 
     # -------------------------
     # Padding-aware keyword search using mmap
     # -------------------------
-    def search_keyword(self, keyword: str, padding: int = 8) -> List[Dict[str, str]]:
+    def search_keyword(self, keyword: Union[str, bytes], padding: int = 8, jit: bool = False,
+                       decode: bool = True) -> List[Dict]:
         """
         Fast memory-mapped keyword search.
         - Uses section offsets
-        - Reads records in padding-aware strides
+        - Scans only the keyword blob; contents are read through the offset arrays on a hit
+        - Scans with mmap.find and only accepts hits on a padding-aligned keyword slot
+        - Fixed-length keywords are compared all at once with _scan_fixed
+        - jit=True walks the slots with the numba-compiled _scan_records instead of
+          either scan, for fixed- and mixed-length sections alike (ignored when numba
+          is not installed; the first call pays for importing numba and compiling)
+        - keyword may be str or bytes; decode=False returns contents as raw bytes
+        - padding comes from the section metadata; the argument is kept for compatibility
         """
         if not self._index:
             self.parse_index()
@@ -252,31 +682,278 @@ class RAGFileReader:
         if "keyword" not in self._index:
             return []
 
-        start, end = self._index["keyword"]
+        start, _ = self._index["keyword"]
+        kw_bytes = _as_bytes(keyword)
         results = []
 
         with open(self.filepath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
-            pos = start
-            while pos < end:
-                # read one padded block
-                block = mm[pos: pos + padding * 256]  # read in reasonable chunks
-                if not block:
+            if not self._bloom_may_contain(mm, _keyword_digest(kw_bytes)):
+                return results
+
+            padding, keyword_length, n, kw_start, ct_start = self._keyword_meta(mm, start)
+            self._advise(mm, "MADV_SEQUENTIAL", kw_start, ct_start)
+            stride = (keyword_length // padding + 1) * padding
+            use_jit = jit and _jit_scan_records() is not None
+
+            if keyword_length and len(kw_bytes) != keyword_length:
+                # every keyword has the same length: a query of any other length cannot match
+                rows = []
+            elif keyword_length and stride % 8 == 0 and not use_jit:
+                rows = self._scan_fixed(mm, kw_start, n, stride, kw_bytes)
+            else:
+                needle = kw_bytes + b"\x00"
+                if use_jit:
+                    hits = self._scan_jit(kw_start, ct_start, padding, needle)
+                else:
+                    hits = self._scan_find(mm, kw_start, ct_start, padding, needle)
+                rows = self._keyword_rows(mm, start, n, [hit - kw_start for hit in hits])
+
+            for row in rows:
+                content = self._content(mm, start, n, ct_start, row)
+                results.append({"keyword": keyword, "content": content.decode("utf-8") if decode else content})
+
+        return results
+
+    def _bloom_may_contain(self, mm: mmap.mmap, digest: Tuple[int, int]) -> bool:
+        """
+        Checks the keyword Bloom filter: False means the keyword is definitely
+        absent, True means it may be present (or the file has no filter).
+        """
+        if "kw_bloom" not in self._index:
+            return True
+
+        start, end = self._index["kw_bloom"]
+        (nhashes,) = struct.unpack_from(self._struct_prefix + "B", mm, start - 1)
+        word_fmt = self._struct_prefix + "Q"
+        for bit in _bloom_bits(digest, (end - start) * 8, nhashes):
+            (word,) = struct.unpack_from(word_fmt, mm, start + 8 * (bit >> 6))
+            if not word & (1 << (bit & 63)):
+                return False
+        return True
+
+    def _keyword_meta(self, mm: mmap.mmap, start: int):
+        """
+        Returns (padding, keyword_length, n_records, keywords_start, contents_start)
+        from the keyword section metadata preceding `start`.
+        """
+        return struct.unpack_from(self._struct_prefix + "BBQQQ", mm, start - 26)
+
+    def _keyword_rows(self, mm: mmap.mmap, start: int, n: int, offsets: List[int]) -> List[int]:
+        """
+        Record indices of the keyword slots at `offsets` (relative to keywords-start).
+        """
+        if not offsets:
+            return []
+        kw_offsets = np.frombuffer(mm, dtype=self._struct_prefix + "u8", count=n + 1, offset=start)
+        rows = np.searchsorted(kw_offsets, offsets).tolist()
+        del kw_offsets  # release the mmap export before the caller closes it
+        return rows
+
+    def _content(self, mm: mmap.mmap, start: int, n: int, ct_start: int, row: int) -> bytes:
+        """
+        Raw content of record `row`, located through the content offset array.
+        """
+        a, b = struct.unpack_from(self._struct_prefix + "QQ", mm, start + 8 * (n + 1 + row))
+        return mm[ct_start + a:ct_start + b]
+
+    @staticmethod
+    def _scan_fixed(mm: mmap.mmap, kw_start: int, n: int, stride: int, kw_bytes: bytes) -> List[int]:
+        """
+        Vectorized scan of a keyword blob whose slots all have the same stride.
+        The leading words of all slots are masked and compared against the keyword
+        as uint64s in one NumPy expression; stride must be a multiple of 8.
+        Returns record indices.
+        """
+        if n == 0:
+            return []
+        nwords = (len(kw_bytes) + 7) // 8
+        width = nwords * 8
+        target = np.frombuffer(kw_bytes.ljust(width, b"\x00"), dtype="<u8")
+        mask = np.frombuffer((b"\xff" * len(kw_bytes)).ljust(width, b"\x00"), dtype="<u8")
+
+        words = np.frombuffer(mm, dtype="<u8", count=n * stride // 8, offset=kw_start).reshape(n, stride // 8)
+        match = ((words[:, :nwords] & mask) == target).all(axis=1)
+        del words  # release the mmap export before the caller closes it
+        return np.flatnonzero(match).tolist()
+
+    def _scan_find(self, mm: mmap.mmap, start: int, end: int, padding: int, needle: bytes) -> List[int]:
+        """
+        Offsets of the padded records in [start, end) that begin with `needle`, found with mmap.find.
+        """
+        hits = []
+        pos = start
+        while pos < end:
+            hit = mm.find(needle, pos, end)
+            if hit < 0:
+                break
+
+            term = mm.find(b"\x00", hit, end)
+            if term < 0:
+                term = end
+
+            # a record starts at an aligned offset right after the previous record's padding
+            if (hit - start) % padding == 0 and (hit == start or mm[hit - 1] == 0):
+                hits.append(hit)
+
+            # the hit's record ends at term; resume at the next aligned record
+            pos = self._next_record(start, term, padding)
+        return hits
+
+    def _scan_jit(self, start: int, end: int, padding: int, needle: bytes) -> List[int]:
+        """
+        Same as _scan_find, but walks every record with the compiled _scan_records.
+        Uses its own np.memmap rather than a view of the caller's mmap: numba may keep
+        the arguments of the compiling call alive, which would block closing that mmap.
+        """
+        buf = np.memmap(self.filepath, dtype=np.uint8, mode="r")
+        hits = _jit_scan_records()(buf, start, end, padding, np.frombuffer(needle, dtype=np.uint8))
+        return hits.tolist()
+        
+    # -------------------------
+    # Hash-indexed keyword lookup
+    # -------------------------
+    def search_keyword_indexed(self, keyword: Union[str, bytes], padding: int = 8,
+                               decode: bool = True) -> List[Dict]:
+        """
+        Constant-time keyword lookup through the keyword hash section.
+        - Hashes the query once and probes the table linearly until an empty slot
+        - Only reads the records the probed slots point at
+        - Falls back to search_keyword for files without a hash section
+        - keyword may be str or bytes; decode=False returns contents as raw bytes
+        """
+        if not self._index:
+            self.parse_index()
+
+        if "keyword_hash" not in self._index:
+            return self.search_keyword(keyword, padding=padding, decode=decode)
+
+        start, _ = self._index["keyword"]
+        table_start, table_end = self._index["keyword_hash"]
+        nslots = (table_end - table_start) // 8
+        if nslots == 0:
+            return []
+
+        kw_bytes = _as_bytes(keyword)
+        needle = kw_bytes + b"\x00"
+        slot_fmt = self._struct_prefix + "Q"
+        mask = nslots - 1
+        results = []
+
+        with open(self.filepath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # one digest serves both the Bloom filter and the hash table
+            digest = _keyword_digest(kw_bytes)
+            if not self._bloom_may_contain(mm, digest):
+                return results
+
+            _, _, n, kw_start, ct_start = self._keyword_meta(mm, start)
+            self._advise(mm, "MADV_RANDOM", table_start, table_end)
+            slot = digest[0] & mask
+            for _ in range(nslots):
+                (value,) = struct.unpack_from(slot_fmt, mm, table_start + 8 * slot)
+                if value == 0:
                     break
 
-                # Split records by null padding
-                records = block.split(b'\x00')
-                for rec in records:
-                    if b"-" not in rec:
-                        continue
-                    k, v = rec.split(b"-", 1)
-                    if k.decode("utf-8") == keyword:
-                        results.append({"keyword": k.decode("utf-8"), "content": v.decode("utf-8")})
-                        # break here if we only want first match
+                row = value - 1
+                (offset,) = struct.unpack_from(slot_fmt, mm, start + 8 * row)
+                if mm[kw_start + offset:kw_start + offset + len(needle)] == needle:
+                    content = self._content(mm, start, n, ct_start, row)
+                    results.append({"keyword": keyword, "content": content.decode("utf-8") if decode else content})
 
-                pos += len(block)
+                slot = (slot + 1) & mask
 
         return results
-        
+
+    # -------------------------
+    # Multi-keyword search
+    # -------------------------
+    def search_keyword_batch(self, keywords: List[Union[str, bytes]],
+                             decode: bool = True) -> Dict[Union[str, bytes], List[Dict]]:
+        """
+        Looks up many keywords with a single pass over the keyword blob.
+        - Queries rejected by the Bloom filter are dropped up front
+        - The rest go into a set; every keyword slot is read once and checked against it
+        - Returns {keyword: [{"keyword", "content"}, ...]} with an entry for every query
+        - keywords may be str or bytes; queries that encode to the same bytes
+          (e.g. "a" and b"a") each get the matches
+        - decode=False returns contents as raw bytes
+        """
+        if not self._index:
+            self.parse_index()
+
+        results = {keyword: [] for keyword in keywords}
+        if "keyword" not in self._index:
+            return results
+
+        start, _ = self._index["keyword"]
+
+        with open(self.filepath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # encoded keyword -> every query that encodes to it
+            wanted = {}
+            for keyword in results:
+                kw_bytes = _as_bytes(keyword)
+                if self._bloom_may_contain(mm, _keyword_digest(kw_bytes)):
+                    wanted.setdefault(kw_bytes, []).append(keyword)
+            if not wanted:
+                return results
+
+            _, keyword_length, n, kw_start, ct_start = self._keyword_meta(mm, start)
+            self._advise(mm, "MADV_SEQUENTIAL", kw_start, ct_start)
+            offsets = struct.unpack_from(f"{self._struct_prefix}{n + 1}Q", mm, start)
+            blob = mm[kw_start:ct_start]
+
+            for row in range(n):
+                a = offsets[row]
+                # fixed-length slots need no terminator search
+                b = a + keyword_length if keyword_length else blob.index(b"\x00", a)
+                queries = wanted.get(blob[a:b])
+                if queries is not None:
+                    content = self._content(mm, start, n, ct_start, row)
+                    if decode:
+                        content = content.decode("utf-8")
+                    for keyword in queries:
+                        results[keyword].append({"keyword": keyword, "content": content})
+
+        return results
+
+    # -------------------------
+    # Embedding-content section
+    # -------------------------
+    def read_embeddings(self, dim: int) -> List[Dict]:
+        """
+        Reads every embedding-content pair of the vector section.
+        - Precision and padding come from the section metadata
+        - dim is the embedding length (not stored in the file)
+        - Embeddings are decoded in one batch; bf16 is widened to float32 and
+          fp8 e5m2 to float16
+        """
+        if not self._index:
+            self.parse_index()
+
+        if "vector" not in self._index:
+            return []
+
+        start, end = self._index["vector"]
+        prefix = self._struct_prefix
+
+        with open(self.filepath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            self._advise(mm, "MADV_SEQUENTIAL", start, end)
+            (precision,) = struct.unpack_from(prefix + "B", mm, start - 18)
+            (padding,) = struct.unpack_from(prefix + "B", mm, start - 1)
+            row_bytes = dim * _PRECISION_ITEMSIZE[precision]
+
+            rows, contents = [], []
+            pos = start
+            while pos < end:
+                term = mm.find(b"\x00", pos + row_bytes + 1, end)
+                if term < 0:
+                    term = end
+                rows.append(mm[pos:pos + row_bytes])
+                contents.append(mm[pos + row_bytes + 1:term].decode("utf-8"))
+                pos = self._next_record(start, term, padding)
+
+        mat = _decode_embeddings(b"".join(rows), precision, dim)
+        return [{"embedding": emb, "content": content} for emb, content in zip(mat, contents)]
+
     # Debug
     # -------------------------
     def hexdump(self, length=256):